@@ -2,43 +2,254 @@
 #
 #  Use of this source code is governed by a BSD-3-clause license that can be
 #  found in the LICENSE.txt file or at https://opensource.org/licenses/BSD-3-Clause
+import functools
 import itertools
+import os
 import platform
+import tempfile
+from typing import Dict, Tuple
 
 import numpy as np
 import pytest
+from filelock import FileLock
 
 import coremltools as ct
 from coremltools.converters.mil.mil import Builder as mb
 from coremltools.converters.mil.mil import get_new_symbol, types
 from coremltools.converters.mil.mil.ops.tests.iOS14 import backends
-from coremltools.converters.mil.mil.ops.tests.testing_utils import run_compare_builder
+from coremltools.converters.mil.mil.ops.tests.testing_utils import (
+    run_compare_builder,
+    run_compare_converted_model,
+)
 from coremltools.converters.mil.mil.types import builtin_to_string, nptype_from_builtin
-from coremltools.converters.mil.testing_reqs import compute_units
+from coremltools.converters.mil.testing_reqs import BackendConfig, compute_units
 from coremltools.converters.mil.testing_utils import random_gen, ssa_fn
 
+_MACHINE = platform.machine()
+
+
+def _xdist_group_by_backend(params, marks=()):
+    """
+    Wrap each parametrization in ``pytest.param`` with an ``xdist_group`` mark named after its
+    backend config (backend, precision and opset version), so ``pytest -n auto --dist loadgroup``
+    keeps the cases of one config on the same worker. Additional ``marks`` are applied to every
+    parametrization.
+    """
+    grouped = []
+    for param in params:
+        values = param if isinstance(param, tuple) else (param,)
+        backend = next(v for v in values if isinstance(v, BackendConfig))
+        group = f"{backend.backend}-{backend.precision}-{backend.opset_version.name}"
+        param_marks = [pytest.mark.xdist_group(name=group), *marks]
+        grouped.append(pytest.param(*values, marks=param_marks))
+    return tuple(grouped)
+
+
+_CU_BACKENDS = _xdist_group_by_backend(itertools.product(compute_units, backends))
+# fp16 linear is only covered on mlprogram, since neuralnetwork models always compute in fp32.
+_CU_BACKENDS_RANK_DTYPE = _xdist_group_by_backend(
+    (compute_unit, backend, rank, dtype)
+    for compute_unit, backend, rank, dtype in itertools.product(
+        compute_units, backends, (2, 3, 5), (np.float32, np.float16)
+    )
+    if dtype == np.float32 or backend.backend == "mlprogram"
+)
+_BACKENDS = _xdist_group_by_backend(backends)
+
+_NEURAL_ENGINE_COMPUTE_UNITS = (ct.ComputeUnit.ALL, ct.ComputeUnit.CPU_AND_NE)
+
+
+@pytest.fixture(scope="session")
+def _ane_lock():
+    return FileLock(os.path.join(tempfile.gettempdir(), "coreml_ane.lock"))
+
+
+@pytest.fixture(autouse=True)
+def _serialize_neural_engine_cases(request, _ane_lock):
+    """
+    Hold ``_ane_lock`` while running a case of a test marked ``uses_neural_engine`` whose
+    ``compute_unit`` may schedule it on the Neural Engine, so such cases serialize across
+    pytest-xdist workers while CPU / GPU cases run in parallel.
+    """
+    params = request.node.callspec.params if hasattr(request.node, "callspec") else {}
+    if (
+        request.node.get_closest_marker("uses_neural_engine") is not None
+        and params.get("compute_unit") in _NEURAL_ENGINE_COMPUTE_UNITS
+    ):
+        with _ane_lock:
+            yield
+    else:
+        yield
+
+
+_RNG_CACHE: Dict[Tuple, np.ndarray] = {}
+
+
+def _cached_rand(shape, dtype=np.float32):
+    """
+    Return a read-only ``np.random.rand`` array of the given shape and dtype, generated once per
+    process and reused by every parametrization of the stress tests that requests the same shape.
+    """
+    key = (tuple(int(s) for s in shape), np.dtype(dtype))
+    arr = _RNG_CACHE.get(key)
+    if arr is None:
+        arr = np.random.rand(*key[0]).astype(dtype)
+        arr.setflags(write=False)
+        _RNG_CACHE[key] = arr
+    return arr
+
+
+@functools.lru_cache(maxsize=32)
+def _cached_random_gen(shape, rand_min, rand_max):
+    """Read-only ``random_gen`` result, reused across calls with the same shape and range."""
+    a = random_gen(shape=shape, rand_min=rand_min, rand_max=rand_max)
+    a.setflags(write=False)
+    return a
+
+
+@pytest.fixture(scope="module")
+def _converted_models():
+    return {}
+
+
+def _run_compare_builder_per_backend(
+    converted_models,
+    key,
+    build,
+    input_placeholders,
+    input_values,
+    expected_output_types,
+    expected_outputs,
+    compute_unit,
+    backend,
+    **kwargs,
+):
+    """
+    ``run_compare_builder``, but the program is converted only once per ``(key, backend)`` and the
+    converted model is reloaded for the other compute units. ``key`` must identify a program
+    whose build function and constants do not change between calls.
+    """
+    mlmodel = converted_models.get((key, backend))
+    if mlmodel is None:
+        converted_models[(key, backend)] = run_compare_builder(
+            build,
+            input_placeholders,
+            input_values,
+            expected_output_types,
+            expected_outputs,
+            compute_unit=compute_unit,
+            backend=backend,
+            **kwargs,
+        )
+    else:
+        run_compare_converted_model(
+            mlmodel, input_values, expected_outputs, compute_unit, backend, **kwargs
+        )
+
+
+def _build_linear(weight_val, bias_val):
+    def build(x):
+        if weight_val.dtype == np.float16:
+            x = mb.cast(x=x, dtype="fp16")
+        return [mb.linear(x=x, weight=weight_val, bias=bias_val)]
+
+    return build
+
+
+def _build_matmul(x_val=None, y_val=None, transpose_x=False, transpose_y=False):
+    """
+    Build function of a single ``mb.matmul``. An operand given as ``x_val`` / ``y_val`` is used as a
+    const, otherwise it is expected as a program input of the same name.
+    """
+
+    def build(**inputs):
+        return [
+            mb.matmul(
+                x=inputs.get("x", x_val),
+                y=inputs.get("y", y_val),
+                transpose_x=transpose_x,
+                transpose_y=transpose_y,
+            )
+        ]
+
+    return build
+
+
+def _build_einsum(equation):
+    def build(x, y):
+        return mb.einsum(values=(x, y), equation=equation)
+
+    return build
+
+
+_EINSUM_STRESS_EQUATIONS = {3: "vnm,mno->vno", 4: "abcd,adce->abce"}
+
+
+@functools.lru_cache(maxsize=None)
+def _einsum_stress_data(rank, broadcast):
+    """
+    Generate the ``(x_val, y_val, expected_output)`` triple of the ``TestEinsum`` stress test for
+    ``rank`` and ``broadcast``. The RNG is seeded from the parameters, so every backend and
+    compute unit sees the same data and the reference einsum is only computed once.
+    """
+    rng = np.random.default_rng((rank, int(broadcast)))
+    equation = _EINSUM_STRESS_EQUATIONS[rank]
+    shape_x = rng.integers(low=2, high=16, size=rank).astype(np.int32)
+    shape_y = rng.integers(low=2, high=12, size=rank).astype(np.int32)
+    shape_y[-3] = shape_x[-1]
+    shape_y[-2] = 1 if broadcast else shape_x[-2]
+    if rank == 4:
+        shape_x[-4] = 1 if broadcast else shape_y[-4]
+
+    x_val = rng.random(tuple(shape_x), dtype=np.float32)
+    y_val = rng.random(tuple(shape_y), dtype=np.float32)
+
+    if broadcast:
+        # Materialize the broadcast operands so np.einsum sees contiguous inputs and can
+        # dispatch the contraction to BLAS.
+        if rank == 3:
+            target_shape_x = [shape_x[-3], shape_x[-2], shape_x[-1]]
+            target_shape_y = [shape_y[-3], shape_x[-2], shape_y[-1]]
+        else:
+            target_shape_x = [shape_y[-4], shape_x[-3], shape_x[-2], shape_x[-1]]
+            target_shape_y = [shape_y[-4], shape_y[-3], shape_x[-2], shape_y[-1]]
+        expected_output = np.einsum(
+            equation,
+            np.ascontiguousarray(np.broadcast_to(x_val, target_shape_x)),
+            np.ascontiguousarray(np.broadcast_to(y_val, target_shape_y)),
+        )
+    else:
+        expected_output = np.einsum(equation, x_val, y_val)
+
+    for arr in (x_val, y_val, expected_output):
+        arr.setflags(write=False)
+    return x_val, y_val, expected_output
+
+
+# Fixed per rank so the cached inputs are reused; includes size-1 leading and inner dims.
+_LINEAR_STRESS_X_SHAPES = {2: (1, 2), 3: (2, 1, 1), 5: (1, 2, 1, 2, 2)}
+
 
 class TestLinear:
-    @pytest.mark.parametrize(
-        "compute_unit, backend",
-        itertools.product(compute_units, backends),
-    )
-    def test_builder_to_backend_smoke(self, compute_unit, backend):
+    @pytest.mark.uses_neural_engine
+    @pytest.mark.parametrize("compute_unit, backend", _CU_BACKENDS)
+    def test_builder_to_backend_smoke(self, compute_unit, backend, _converted_models):
         x_val = np.array([[-4.7182, 11.94], [-3.3939, 9.2166]], dtype=np.float32)
         weight_val = np.array([[1.2313, -0.095], [-1.4075, -0.8816]], dtype=np.float32)
         bias_val = np.array([1.0, 2.0], dtype=np.float32)
         input_placeholders = {"x": mb.placeholder(shape=x_val.shape)}
         input_values = {"x": x_val}
 
-        def build(x):
-            return [mb.linear(x=x, weight=weight_val, bias=bias_val)]
+        build = _build_linear(weight_val, bias_val)
 
         expected_output_types = [(2, 2, types.fp32)]
         expected_outputs = [
             np.array([[-5.9438195, -1.8854373], [-4.054486, -1.3484411]], dtype=np.float32)
         ]
 
-        run_compare_builder(
+        _run_compare_builder_per_backend(
+            _converted_models,
+            "linear_smoke",
             build,
             input_placeholders,
             input_values,
@@ -50,50 +261,48 @@ class TestLinear:
 
     @ssa_fn
     def test_builder_eval(self):
-        x_val = random_gen(shape=(2, 2), rand_min=-37, rand_max=64)
-        weight_val = random_gen(shape=(2, 2), rand_min=-91, rand_max=84)
-        bias_val = random_gen(shape=(2,), rand_min=0.0, rand_max=9.0)
+        x_val = _cached_random_gen(shape=(2, 2), rand_min=-37, rand_max=64)
+        weight_val = _cached_random_gen(shape=(2, 2), rand_min=-91, rand_max=84)
+        bias_val = _cached_random_gen(shape=(2,), rand_min=0.0, rand_max=9.0)
         v = mb.linear(x=x_val, weight=weight_val, bias=bias_val)
         np.testing.assert_allclose(
-            np.matmul(x_val, weight_val.T) + bias_val, v.val, atol=1e-04, rtol=1e-05
+            np.einsum("ij,kj->ik", x_val, weight_val) + bias_val, v.val, atol=1e-04, rtol=1e-05
         )
 
-    @pytest.mark.parametrize(
-        "compute_unit, backend, rank",
-        itertools.product(compute_units, backends, [2, 3, 5]),
-    )
-    def test_builder_to_backend_stress(self, compute_unit, backend, rank):
+    @pytest.mark.uses_neural_engine
+    @pytest.mark.parametrize("compute_unit, backend, rank, dtype", _CU_BACKENDS_RANK_DTYPE)
+    def test_builder_to_backend_stress(self, compute_unit, backend, rank, dtype):
         if backend.backend == "mlprogram" and compute_unit != ct.ComputeUnit.CPU_ONLY:
             pytest.xfail("rdar://97398733 (TestLinear failing on mlprogram + GPU)")
 
         if (
             backend.backend == "neuralnetwork"
             and compute_unit != ct.ComputeUnit.CPU_ONLY
-            and platform.machine() == "arm64"
+            and _MACHINE == "arm64"
             and rank == 5
         ):
             pytest.xfail(
                 "rdar://98015195 ([M1 native tests] Some MIL unittests are failing on M1 native)"
             )
 
-        x_shape = np.random.randint(low=1, high=3, size=(rank,))
-        x_val = np.random.rand(*x_shape)
+        x_shape = _LINEAR_STRESS_X_SHAPES[rank]
+        x_val = _cached_rand(x_shape)
         out_channels = 3
-        w_shape = np.array([out_channels, x_shape[-1]])
-        weight_val = np.random.rand(*w_shape).astype(np.float32)
-        bias_val = np.random.rand(out_channels).astype(np.float32)
+        w_shape = (out_channels, x_shape[-1])
+        weight_val = _cached_rand(w_shape, dtype=dtype)
+        bias_val = _cached_rand((out_channels,), dtype=dtype)
         input_placeholders = {
             "x": mb.placeholder(shape=x_val.shape),
         }
         input_values = {"x": x_val}
 
-        def build(x):
-            return [mb.linear(x=x, weight=weight_val, bias=bias_val)]
+        build = _build_linear(weight_val, bias_val)
 
-        expected_outputs = [np.matmul(x_val, np.transpose(weight_val)) + bias_val]
+        expected_outputs = [np.einsum("...i,ji->...j", x_val, weight_val) + bias_val]
 
         expected_output_types = [o.shape[:] + (types.fp32,) for o in expected_outputs]
 
+        atol, rtol = (1e-2, 1e-2) if dtype == np.float16 else (1e-04, 1e-05)
         run_compare_builder(
             build,
             input_placeholders,
@@ -102,11 +311,15 @@ class TestLinear:
             expected_outputs=expected_outputs,
             compute_unit=compute_unit,
             backend=backend,
+            atol=atol,
+            rtol=rtol,
         )
 
     @pytest.mark.parametrize(
         "compute_unit, backend, input_type",
-        itertools.product(compute_units, backends, [types.int32, types.fp16, types.fp32]),
+        _xdist_group_by_backend(
+            itertools.product(compute_units, backends, [types.int32, types.fp16, types.fp32])
+        ),
     )
     def test_default_bias_type(self, compute_unit, backend, input_type):
         # Test the default bias matches the dtype of x and weight.
@@ -122,93 +335,107 @@ class TestLinear:
             return res
 
 
+# Small shapes covering the same rank and broadcasting patterns as the large ones.
+_MATMUL_STRESS_FAST_SHAPES = (
+    ((2, 2, 3, 4), (2, 2, 4, 3)),
+    ((1, 1, 1, 2, 3), (1, 2, 2, 3, 2)),
+    ((1, 2, 1, 2, 3), (1, 3, 3, 2)),
+    ((1, 2, 3), (2, 2, 3, 4)),
+)
+_MATMUL_STRESS_SLOW_SHAPES = (((7, 4), (3, 9, 5, 4, 3)),)
+
+
 class TestMatMul:
-    @pytest.mark.parametrize("compute_unit, backend", itertools.product(compute_units, backends))
-    def test_builder_to_backend_smoke(self, compute_unit, backend):
+    # variant -> ([(const x, const y), ...], transpose_x, transpose_y, expected output)
+    # The operand combinations of a variant all produce the same result, so they are built as
+    # outputs of a single program and only one compile is paid per variant.
+    _SMOKE_VARIANTS = {
+        "plain": (
+            [(True, False), (False, True), (False, False)],
+            False,
+            False,
+            [[-17.0, -76.0], [-12.0, -51.0]],
+        ),
+        "both_tt": (
+            [(False, False), (True, False), (False, True)],
+            True,
+            True,
+            [[17.0, 28.0], [-50.0, -85.0]],
+        ),
+        "tx_only": ([(False, True)], True, False, [[-1.0, 52.0], [4.0, -163.0]]),
+        "ty_only": ([(False, True)], False, True, [[-95.0, -100.0], [-66.0, -69.0]]),
+    }
+
+    @pytest.mark.uses_neural_engine
+    @pytest.mark.parametrize(
+        "compute_unit, backend, variant",
+        _xdist_group_by_backend(
+            itertools.product(compute_units, backends, _SMOKE_VARIANTS.keys())
+        ),
+    )
+    def test_builder_to_backend_smoke(self, compute_unit, backend, variant):
+        operands, transpose_x, transpose_y, expected_output = self._SMOKE_VARIANTS[variant]
         x_val = np.array([[-4.0, 13.0], [-3.0, 9.0]], dtype=np.float32)
         y_val = np.array([[1.0, -7.0], [-1.0, -8.0]], dtype=np.float32)
-        input_placeholders = {
-            "x": mb.placeholder(shape=x_val.shape),
-            "y": mb.placeholder(shape=y_val.shape),
-        }
-        input_values = {"x": x_val, "y": y_val}
-
-        def build(x, y):
+        input_placeholders = {}
+        input_values = {}
+        if not all(const_x for const_x, _ in operands):
+            input_placeholders["x"] = mb.placeholder(shape=x_val.shape)
+            input_values["x"] = x_val
+        if not all(const_y for _, const_y in operands):
+            input_placeholders["y"] = mb.placeholder(shape=y_val.shape)
+            input_values["y"] = y_val
+
+        def build(**inputs):
             return [
-                mb.matmul(x=x_val, y=y),
-                mb.matmul(x=x, y=y_val),
-                mb.matmul(x=x, y=y),
-                mb.matmul(x=x, y=y, transpose_x=True, transpose_y=True),
-                mb.matmul(x=x_val, y=y, transpose_x=True, transpose_y=True),
-                mb.matmul(x=x, y=y_val, transpose_x=True, transpose_y=True),
-                mb.matmul(x=x, y=y_val, transpose_x=True, transpose_y=False),
-                mb.matmul(x=x, y=y_val, transpose_x=False, transpose_y=True),
+                mb.matmul(
+                    x=x_val if const_x else inputs["x"],
+                    y=y_val if const_y else inputs["y"],
+                    transpose_x=transpose_x,
+                    transpose_y=transpose_y,
+                )
+                for const_x, const_y in operands
             ]
 
-        expected_output_types = [
-            (2, 2, types.fp32),
-            (2, 2, types.fp32),
-            (2, 2, types.fp32),
-            (2, 2, types.fp32),
-            (2, 2, types.fp32),
-            (2, 2, types.fp32),
-            (2, 2, types.fp32),
-            (2, 2, types.fp32),
-        ]
-        expected_outputs = [
-            np.array([[-17.0, -76.0], [-12.0, -51.0]], dtype=np.float32),
-            np.array([[-17.0, -76.0], [-12.0, -51.0]], dtype=np.float32),
-            np.array([[-17.0, -76.0], [-12.0, -51.0]], dtype=np.float32),
-            np.array([[17.0, 28.0], [-50.0, -85.0]], dtype=np.float32),
-            np.array([[17.0, 28.0], [-50.0, -85.0]], dtype=np.float32),
-            np.array([[17.0, 28.0], [-50.0, -85.0]], dtype=np.float32),
-            np.array([[-1.0, 52.0], [4.0, -163.0]], dtype=np.float32),
-            np.array([[-95.0, -100.0], [-66.0, -69.0]], dtype=np.float32),
-        ]
-
         run_compare_builder(
             build,
             input_placeholders,
             input_values,
-            expected_output_types,
-            expected_outputs,
+            expected_output_types=[(2, 2, types.fp32)] * len(operands),
+            expected_outputs=[np.array(expected_output, dtype=np.float32)] * len(operands),
             compute_unit=compute_unit,
             backend=backend,
         )
 
     @ssa_fn
     def test_builder_eval(self):
-        x_val = random_gen(shape=(2, 2, 4), rand_min=-37, rand_max=64)
-        y_val = random_gen(shape=(2, 4, 2), rand_min=-91, rand_max=84)
+        x_val = _cached_random_gen(shape=(2, 2, 4), rand_min=-37, rand_max=64)
+        y_val = _cached_random_gen(shape=(2, 4, 2), rand_min=-91, rand_max=84)
         v = mb.matmul(x=x_val, y=y_val)
         np.testing.assert_allclose(np.matmul(x_val, y_val), v.val, atol=1e-04, rtol=1e-05)
 
+    @pytest.mark.uses_neural_engine
     @pytest.mark.parametrize(
         "compute_unit, backend, shapes",
-        itertools.product(
-            compute_units,
-            backends,
-            [
-                ((3, 2, 3, 4), (3, 2, 4, 5)),
-                ((1, 1, 1, 3, 4), (1, 3, 2, 4, 5)),
-                ((1, 3, 1, 2, 3), (1, 4, 3, 2)),
-                ((1, 3, 4), (3, 2, 4, 6)),
-                ((7, 4), (3, 9, 5, 4, 3)),
-            ],
+        _xdist_group_by_backend(
+            itertools.product(compute_units, backends, _MATMUL_STRESS_FAST_SHAPES)
+        )
+        + _xdist_group_by_backend(
+            itertools.product(compute_units, backends, _MATMUL_STRESS_SLOW_SHAPES),
+            marks=[pytest.mark.slow],
         ),
     )
     def test_builder_to_backend_stress(self, compute_unit, backend, shapes):
         shape_x, shape_y = shapes
-        x_val = np.random.rand(*shape_x)
-        y_val = np.random.rand(*shape_y)
+        x_val = _cached_rand(shape_x)
+        y_val = _cached_rand(shape_y)
         input_placeholders = {
             "x": mb.placeholder(shape=x_val.shape),
             "y": mb.placeholder(shape=y_val.shape),
         }
         input_values = {"x": x_val, "y": y_val}
 
-        def build(x, y):
-            return [mb.matmul(x=x, y=y, transpose_x=False, transpose_y=False)]
+        build = _build_matmul()
 
         expected_outputs = [np.matmul(x_val, y_val)]
         expected_output_types = [o.shape[:] + (types.fp32,) for o in expected_outputs]
@@ -223,32 +450,40 @@ class TestMatMul:
             backend=backend,
         )
 
+    @pytest.mark.uses_neural_engine
     @pytest.mark.parametrize(
         "compute_unit, backend, shape_x",
-        itertools.product(
-            compute_units,
-            backends,
-            [
-                (5,),
-                (2, 5),
-                (2, 2, 5),
-                (4, 3, 2, 5),
-                (5, 4, 2, 3, 5),
-            ],
+        _xdist_group_by_backend(
+            itertools.product(
+                compute_units,
+                backends,
+                [
+                    (5,),
+                    (2, 5),
+                    (2, 2, 5),
+                    (4, 3, 2, 5),
+                ],
+            )
+        )
+        + _xdist_group_by_backend(
+            itertools.product(compute_units, backends, [(5, 4, 2, 3, 5)]),
+            marks=[pytest.mark.slow],
         ),
     )
     def test_builder_y_rank_2_const(self, compute_unit, backend, shape_x):
-        x_val = np.random.rand(*shape_x)
-        y_val = np.random.rand(5, 10)
+        x_val = np.random.rand(*shape_x).astype(np.float32, copy=False)
+        y_val = np.random.rand(5, 10).astype(np.float32, copy=False)
         input_placeholders = {
             "x": mb.placeholder(shape=x_val.shape),
         }
         input_values = {"x": x_val}
 
-        def build(x):
-            return [mb.matmul(x=x, y=y_val, transpose_x=False, transpose_y=False)]
+        build = _build_matmul(y_val=y_val)
 
-        expected_outputs = [np.matmul(x_val, y_val)]
+        # Fold the batch dimensions of x into a single 2D GEMM against the rank-2 y.
+        x_2d = x_val.reshape(-1, x_val.shape[-1])
+        expected_output = np.matmul(x_2d, y_val).reshape(*x_val.shape[:-1], y_val.shape[-1])
+        expected_outputs = [expected_output]
         expected_output_types = [o.shape[:] + (types.fp32,) for o in expected_outputs]
 
         run_compare_builder(
@@ -261,19 +496,21 @@ class TestMatMul:
             backend=backend,
         )
 
-    @pytest.mark.parametrize(
-        "compute_unit, backend",
-        itertools.product(compute_units, backends),
-    )
-    def test_builder_transpose_y(self, compute_unit, backend):
-        x_val = np.random.rand(3, 2, 7, 16)
-        y_val = np.random.rand(3, 2, 5, 16)
-
-        def build(x):
-            return mb.matmul(x=x, y=y_val, transpose_x=False, transpose_y=True)
-
-        expected_output = np.matmul(x_val, np.transpose(y_val, (0, 1, 3, 2)))
-        run_compare_builder(
+    @pytest.mark.uses_neural_engine
+    @pytest.mark.parametrize("compute_unit, backend", _CU_BACKENDS)
+    def test_builder_transpose_y(self, compute_unit, backend, _converted_models):
+        # The const y is baked into the converted model, so it must be the same for every
+        # compute unit.
+        x_val = _cached_rand((3, 2, 7, 16))
+        y_val = _cached_rand((3, 2, 5, 16))
+
+        build = _build_matmul(y_val=y_val, transpose_y=True)
+
+        y_val_t = np.ascontiguousarray(y_val.swapaxes(-1, -2))
+        expected_output = np.matmul(x_val, y_val_t)
+        _run_compare_builder_per_backend(
+            _converted_models,
+            "matmul_transpose_y",
             build,
             input_placeholders={"x": mb.placeholder(shape=x_val.shape)},
             input_values={"x": x_val},
@@ -285,14 +522,9 @@ class TestMatMul:
 
 
 class TestEinsum:
-    @pytest.mark.parametrize(
-        "compute_unit, backend",
-        itertools.product(
-            compute_units,
-            backends,
-        ),
-    )
-    def test_builder_to_backend_smoke(self, compute_unit, backend):
+    @pytest.mark.uses_neural_engine
+    @pytest.mark.parametrize("compute_unit, backend", _CU_BACKENDS)
+    def test_builder_to_backend_smoke(self, compute_unit, backend, _converted_models):
         equation = "abcd,adce->abce"
 
         x_val = np.arange(12).astype(np.float32).reshape((2, 1, 3, 2))
@@ -306,12 +538,13 @@ class TestEinsum:
         out_shape[-1] = y_val.shape[-1]
         expected_output_type = tuple(out_shape) + (types.fp32,)
 
-        def build(x, y):
-            return mb.einsum(values=(x, y), equation=equation)
+        build = _build_einsum(equation)
 
         expected_output = np.einsum(equation, x_val, y_val)
 
-        run_compare_builder(
+        _run_compare_builder_per_backend(
+            _converted_models,
+            "einsum_smoke",
             build,
             input_placeholder_dict,
             input_value_dict,
@@ -321,26 +554,22 @@ class TestEinsum:
             backend=backend,
         )
 
+    @pytest.mark.uses_neural_engine
     @pytest.mark.parametrize(
         "compute_unit, rank, broadcast, backend",
-        itertools.product(
-            compute_units,
-            [3, 4],
-            [True, False],
-            backends,
+        _xdist_group_by_backend(
+            itertools.product(
+                compute_units,
+                [3, 4],
+                [True, False],
+                backends,
+            )
         ),
     )
     def test_builder_to_backend_stress(self, compute_unit, rank, broadcast, backend):
-        equation = "abcd,adce->abce" if rank == 4 else "vnm,mno->vno"
-        shape_x = np.random.randint(low=2, high=16, size=rank).astype(np.int32)
-        shape_y = np.random.randint(low=2, high=12, size=rank).astype(np.int32)
-        shape_y[-3] = shape_x[-1]
-        shape_y[-2] = 1 if broadcast else shape_x[-2]
-        if rank == 4:
-            shape_x[-4] = 1 if broadcast else shape_y[-4]
-
-        x_val = np.random.rand(*shape_x)
-        y_val = np.random.rand(*shape_y)
+        equation = _EINSUM_STRESS_EQUATIONS[rank]
+        x_val, y_val, expected_output = _einsum_stress_data(rank, broadcast)
+        shape_x, shape_y = x_val.shape, y_val.shape
         input_placeholder_dict = {
             "x": mb.placeholder(shape=x_val.shape),
             "y": mb.placeholder(shape=y_val.shape),
@@ -354,21 +583,7 @@ class TestEinsum:
         )
         expected_output_type = tuple(out_shape) + (types.fp32,)
 
-        def build(x, y):
-            return mb.einsum(values=(x, y), equation=equation)
-
-        if rank == 3:
-            expected_output = np.einsum(
-                equation,
-                np.broadcast_to(x_val, [shape_x[-3], shape_x[-2], shape_x[-1]]),
-                np.broadcast_to(y_val, [shape_y[-3], shape_x[-2], shape_y[-1]]),
-            )
-        else:
-            expected_output = np.einsum(
-                equation,
-                np.broadcast_to(x_val, [shape_y[-4], shape_x[-3], shape_x[-2], shape_x[-1]]),
-                np.broadcast_to(y_val, [shape_y[-4], shape_y[-3], shape_x[-2], shape_y[-1]]),
-            )
+        build = _build_einsum(equation)
 
         run_compare_builder(
             build,
@@ -388,10 +603,7 @@ class TestEinsum:
         v = mb.einsum(values=(x_val, y_val), equation=equation)
         np.testing.assert_allclose(np.einsum(equation, x_val, y_val), v.val, atol=1e-04, rtol=1e-05)
 
-    @pytest.mark.parametrize(
-        "backend",
-        backends,
-    )
+    @pytest.mark.parametrize("backend", _BACKENDS)
     def test_symbolic_input_conv_and_einsum(self, backend):
         """
         Test a pattern of:
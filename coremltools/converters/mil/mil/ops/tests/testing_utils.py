@@ -74,7 +74,9 @@ def run_compare_builder(
     Inputs:
         - build: python function taking input of Vars and returning Var or
           list[Var]. Each input argument in build must match a key in
-          input_values / input_placeholders.
+          input_values / input_placeholders. All returned Vars are outputs
+          of the same program, which is converted once and predicted once
+          (per prediction iteration) to check every expected output.
 
         - input_placeholders: str -> placeholder. It may not be an empty
                               dict as MLModel doesn't support function with
@@ -196,28 +198,95 @@ def run_compare_builder(
         outputs = None
         if expected_outputs is not None:
             outputs = expected_outputs if pred_iters == 1 else expected_outputs[i]
-            assert len(output_vars) == len(outputs), (
-                f"Provided expected_outputs {len(outputs)}"
-                " should match number of output"
-                f" variables {len(output_vars)}"
-            )
-            outputs = {name: val for name, val in zip(output_names, outputs)}
 
         # run the mlmodel and compare the output numerical
-        compare_backend(
-            mlmodel=mlmodel,
-            input_key_values=input_values,
-            expected_outputs=outputs,
+        _compare_expected_outputs(
+            mlmodel,
+            output_names,
+            input_values,
+            outputs,
+            precision=backend[1],
             atol=atol,
             rtol=rtol,
             also_compare_shapes=also_compare_shapes,
-            dtype=backend[1],
             state=state,
         )
 
     return mlmodel
 
 
+def run_compare_converted_model(
+    mlmodel,
+    input_values,
+    expected_outputs,
+    compute_unit,
+    backend: BackendConfig,
+    atol=1e-04,
+    rtol=1e-05,
+    also_compare_shapes=True,
+):
+    """
+    Reload a stateless mlmodel returned by ``run_compare_builder`` on ``compute_unit`` and compare
+    its predictions against ``expected_outputs``, performing the same checks as
+    ``run_compare_builder``.
+
+    The converted model only depends on the backend, so tests whose program does not change
+    across compute units can convert once per backend and use this for the other compute units.
+
+    Inputs:
+        - expected_outputs: list[np.array] or np.array, in the order of the model outputs.
+
+        - backend: The BackendConfig ``mlmodel`` was converted with.
+    """
+    if not isinstance(expected_outputs, list):
+        expected_outputs = [expected_outputs]
+
+    spec = mlmodel.get_spec()
+    mlmodel = ct.models.MLModel(spec, weights_dir=mlmodel.weights_dir, compute_units=compute_unit)
+    _compare_expected_outputs(
+        mlmodel,
+        [o.name for o in spec.description.output],
+        input_values,
+        expected_outputs,
+        precision=backend.precision,
+        atol=atol,
+        rtol=rtol,
+        also_compare_shapes=also_compare_shapes,
+    )
+    return mlmodel
+
+
+def _compare_expected_outputs(
+    mlmodel,
+    output_names,
+    input_values,
+    expected_outputs,
+    precision,
+    atol,
+    rtol,
+    also_compare_shapes,
+    state=None,
+):
+    if expected_outputs is not None:
+        assert len(output_names) == len(expected_outputs), (
+            f"Provided expected_outputs {len(expected_outputs)}"
+            " should match number of output"
+            f" variables {len(output_names)}"
+        )
+        expected_outputs = {name: val for name, val in zip(output_names, expected_outputs)}
+
+    compare_backend(
+        mlmodel=mlmodel,
+        input_key_values=input_values,
+        expected_outputs=expected_outputs,
+        atol=atol,
+        rtol=rtol,
+        also_compare_shapes=also_compare_shapes,
+        dtype=precision,
+        state=state,
+    )
+
+
 def construct_inputs_from_placeholders(
     input_placeholders: Dict[str, Placeholder], upper_bound: int
 ) -> [List[TensorType]]: